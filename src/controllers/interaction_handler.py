@@ -11,9 +11,12 @@ Classes:
 # Import necessary modules and functions from other files
 from src.config.config import get_env_variable
 from src.utils.tools_init import initialize_tools
-from src.utils.agent_setup_openai import setup_agent
+from src.utils.agent_setup_openai import setup_agent, setup_best_effort_chain
 from langchain.memory import ConversationBufferMemory
+from src.utils.search_prefetch import should_prefetch, speculative_search
+from src.utils.deadline import Deadline, DeadlineExceeded, current_deadline, deadline_scope, run_until_deadline
 from langchain_core.messages import AIMessage, HumanMessage
+from contextlib import nullcontext
 import os
 
 
@@ -30,34 +33,48 @@ class InteractionHandler:
     Attributes:
         tools (dict): Dictionary of initialized tools required for the agent.
         agent_executor (AgentExecutor): Configured agent executor with the initialized tools.
+        best_effort_chain (Runnable): Chain answering from partial tool observations when a turn runs out of time.
         chat_history (list): List to keep track of the conversation history.
+        speculative_search (bool): Whether searches are started speculatively alongside the first model call.
     """
-    def __init__(self, chat_history=[]):
+    def __init__(self, chat_history=[], speculative_search=None):
         """
         Initialize tools and agent executor, and create an empty list to store chat history.
 
         Args:
             chat_history (list, optional): Initial conversation history. Defaults to an empty list.
+            speculative_search (bool, optional): Whether to start Google searches speculatively for inputs
+                that the prompt requires a search for. Defaults to the SPECULATIVE_SEARCH environment variable, or False.
         """
         self.tools = initialize_tools()  # Load and initialize external tools required for the agent
         self.agent_executor = setup_agent(self.tools)  # Setup the agent with the initialized tools
+        self.best_effort_chain = setup_best_effort_chain()  # Setup the fallback used when a turn runs out of time
         self.chat_history = chat_history  # Initialize an empty list to keep track of the conversation history
+        if speculative_search is None:
+            speculative_search = get_env_variable("SPECULATIVE_SEARCH", "false").lower() in ("1", "true", "yes")
+        self.speculative_search = speculative_search
 
 
     ##############################################
     # Define the handle_input method
     # ============================================
-    def handle_input(self, input_value, query=""):
+    def handle_input(self, input_value, query="", deadline=None):
         """
         Process the user's input, determine its type (image or text), 
         and call the appropriate processing function based on the input type.
 
+        When a deadline is given, the turn's model and tool calls share its time budget. A turn that
+        runs out of time returns a best-effort answer built from the tool results gathered so far.
+
         Args:
             input_value (str): The user's input.
             query (str, optional): Additional query for image input. Defaults to an empty string.
+            deadline (float or Deadline, optional): Time budget of the turn in seconds. Defaults to None (unbounded).
 
         Returns:
-            dict: The result of processing the input.
+            dict: The result of processing the input. With a deadline, it also contains "timed_out",
+                "timed_out_steps" (names of the model or tool steps that ran out of time) and "elapsed"
+                (seconds spent on the turn).
         """
         # Check if the input is an image based on a special prefix
         if input_value.lower().startswith("image:"):
@@ -70,14 +87,27 @@ class InteractionHandler:
         input_message = HumanMessage(content=input_value)
         self.chat_history.append(input_message)
         
+        # Start the turn's clock if the caller gave a time budget
+        if deadline is not None and not isinstance(deadline, Deadline):
+            deadline = Deadline(deadline)
+
         # Call the appropriate method based on the input type
-        if input_type == "text":
-            result = self.process_text_input(input_value)
-        elif input_type == "image":
-            result = self.process_image_input(input_value, query)
-        else:
-            # Return an error message for unknown input types
-            return "Unknown input type."
+        with deadline_scope(deadline):
+            if input_type == "text":
+                # Overlap a likely Google search with the first model call
+                with self.speculate(input_value):
+                    result = self.process_text_input(input_value)
+            elif input_type == "image":
+                result = self.process_image_input(input_value, query)
+            else:
+                # Return an error message for unknown input types
+                return "Unknown input type."
+
+        # Report how the turn went against its deadline
+        if deadline is not None:
+            result["timed_out"] = result.get("timed_out", False)
+            result["timed_out_steps"] = list(deadline.timed_out_steps)
+            result["elapsed"] = deadline.elapsed()
         
         # Create an AIMessage object for the output and append it to the chat history
         output_message = AIMessage(content=result['output'])
@@ -85,6 +115,31 @@ class InteractionHandler:
         return result
 
 
+    ##############################################
+    # Define the speculate method
+    # ============================================
+    def speculate(self, input_value):
+        """
+        Start a speculative Google search for text input that will most likely need one.
+
+        Explicit "search:" commands and inputs containing the prompt's search trigger phrases are searched
+        in the background while the model decides; the google_search tool takes over the running result.
+
+        Args:
+            input_value (str): The user's text input.
+
+        Returns:
+            contextmanager: A context keeping the speculative search available, or a no-op context.
+        """
+        if not self.speculative_search:
+            return nullcontext()
+        if input_value.lower().startswith("search:"):
+            return speculative_search(input_value[len("search:"):].strip())
+        if should_prefetch(input_value):
+            return speculative_search(input_value)
+        return nullcontext()
+
+
     ##############################################
     # Define the process_text_input method
     # ============================================
@@ -102,7 +157,7 @@ class InteractionHandler:
         if input_value.lower().startswith("search:"):
             # Extract the search query and invoke the Google search tool
             search_query = input_value[len("search:"):].strip()
-            return self.agent_executor.invoke({
+            return self.invoke_agent({
                 "input": search_query,
                 "tool": "google_search",
                 "action": "run",
@@ -111,7 +166,7 @@ class InteractionHandler:
             })
         elif input_value.lower() == "take a screenshot":
             # Invoke the screenshot grabber tool for taking a screenshot
-            return self.agent_executor.invoke({
+            return self.invoke_agent({
                 "input": "take a screenshot",
                 "tool": "screenshot_grabber",
                 "action": "take_screenshot",
@@ -120,7 +175,7 @@ class InteractionHandler:
             })
         else:
             # For general text input, invoke the agent executor without specifying a tool or action
-            return self.agent_executor.invoke({
+            return self.invoke_agent({
                 "input": input_value,
                 "parameters": {},
                 "chat_history": self.chat_history
@@ -141,7 +196,7 @@ class InteractionHandler:
         Returns:
             dict: The result of processing the image input.
         """
-        return self.agent_executor.invoke({
+        return self.invoke_agent({
             "input": f"Process image: {input_value} with query: {query}",
             "tool": "image_processing_tool",
             "action": "process_image",
@@ -150,6 +205,84 @@ class InteractionHandler:
         })
 
 
+    ##############################################
+    # Define the invoke_agent method
+    # ============================================
+    def invoke_agent(self, inputs):
+        """
+        Invoke the agent executor, within the deadline of the current turn if there is one.
+
+        Under a deadline, the agent runs step by step in a background thread while the tool results are collected.
+        Tools that run out of time report it as their observation, so the agent can carry on. If the turn itself
+        runs out of time, the remaining steps are cancelled and a best-effort answer is returned instead.
+
+        Args:
+            inputs (dict): The inputs for the agent executor.
+
+        Returns:
+            dict: The inputs together with the agent's output, or with the best-effort output if the turn timed out.
+        """
+        deadline = current_deadline()
+        if deadline is None:
+            return self.agent_executor.invoke(inputs)
+
+        # An abandoned turn may keep running, so give it its own copy of the history
+        turn_inputs = {**inputs, "chat_history": list(inputs["chat_history"])}
+        observations = []  # Tool actions and their results, collected as the agent goes
+
+        def run_turn():
+            for chunk in self.agent_executor.iter(turn_inputs):
+                observations.extend(chunk.get("intermediate_step", []))
+                if "output" in chunk:
+                    return chunk
+
+        try:
+            # The iterator adds the turn's messages to the final outputs; invoke() does not return them
+            outputs = {key: value for key, value in run_until_deadline(run_turn, deadline).items() if key != "messages"}
+            return {**inputs, **outputs}
+        except DeadlineExceeded:
+            deadline.cancel()  # Stop the abandoned turn at its next step
+            return self.best_effort_result(inputs, list(observations), deadline)
+
+
+    ##############################################
+    # Define the best_effort_result method
+    # ============================================
+    def best_effort_result(self, inputs, observations, deadline):
+        """
+        Build the result of a turn that ran out of time from the tool results gathered so far.
+
+        The best-effort chain answers within the deadline's reserve; if that fails too,
+        the tool results are returned as they are.
+
+        Args:
+            inputs (dict): The inputs the agent executor was invoked with.
+            observations (list): The (action, observation) pairs gathered before the timeout.
+            deadline (Deadline): The deadline of the turn.
+
+        Returns:
+            dict: The inputs together with the best-effort output, marked as timed out.
+        """
+        # Summarize the gathered tool results for the prompt and the fallback answer
+        summary = "\n\n".join(f"{action.tool} ({action.tool_input}):\n{observation}" for action, observation in observations)
+        output = None
+        if deadline.remaining() > 0:
+            try:
+                output = run_until_deadline(lambda: self.best_effort_chain.invoke({
+                    "input": inputs["input"],
+                    "chat_history": inputs["chat_history"],
+                    "observations": summary or "None",
+                }), Deadline(deadline.remaining(), reserve=0, step_share=1))
+            except Exception:
+                output = None  # Fall back to the raw tool results below
+        if not output:
+            if summary:
+                output = f"I ran out of time before finishing your request. Here is what I found so far:\n\n{summary}"
+            else:
+                output = "I ran out of time before finishing your request. Please try again."
+        return {**inputs, "output": output, "timed_out": True}
+
+
     ##############################################
     # Define the run method
     # ============================================
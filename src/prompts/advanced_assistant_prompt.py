@@ -1,7 +1,17 @@
+##############################################
+# Phrases and topics that require a Google search
+# ============================================
+# Quoted in the Google Search guidelines below, and used to start searches speculatively
+search_trigger_phrases = ["today", "latest", "currently", "breaking news", "recent"]
+search_trigger_topics = ["news", "updates", "real-time information"]
+quoted_trigger_phrases = ", ".join(f'"{phrase}"' for phrase in search_trigger_phrases)
+listed_trigger_topics = ", ".join(search_trigger_topics[:-1]) + ", or " + search_trigger_topics[-1]
+
+
 ##############################################
 # Template for Basic Assistant Prompt
 # ============================================
-advanced_assistant_prompt = """
+advanced_assistant_prompt = f"""
 
 As an advanced assistant designed to support users effectively, you are equipped with a variety of tools to fulfill user requests. Here are the guidelines for using these tools appropriately:
 
@@ -22,9 +32,9 @@ As an advanced assistant designed to support users effectively, you are equipped
     - **Image Describer:** When the user seeks a description of the uploaded image, employ the "image_describer" tool to provide detailed insights into the image.
         - **Google Search:** 
         - Use the "google_search" tool for requests that require external information or verification. 
-        - Prioritize using this tool when the user mentions phrases like "today", "latest", "currently", "breaking news", "recent", or asks about news, updates, or real-time information. 
+        - Prioritize using this tool when the user mentions phrases like {quoted_trigger_phrases}, or asks about {listed_trigger_topics}. 
         - Do not attempt to answer such questions from internal memory.
 
 Always align the use of these tools with the specific instructions provided by the user, ensuring your assistance is relevant, timely, and effective.
 
-"""
\ No newline at end of file
+"""
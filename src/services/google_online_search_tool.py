@@ -1,13 +1,10 @@
-from typing import Optional, Type, ClassVar  # Import ClassVar for static class attributes
+from typing import Optional, Type
 from pydantic import BaseModel, Field  # Use direct Pydantic imports
 from langchain.callbacks.manager import CallbackManagerForToolRun, AsyncCallbackManagerForToolRun
 from langchain.tools import BaseTool
-from langchain_google_community import GoogleSearchAPIWrapper
-from src.config.config import get_env_variable
-
-# Load necessary configuration values from the environment
-google_api_key = get_env_variable("GOOGLE_API_KEY")
-google_cse_id = get_env_variable("GOOGLE_CSE_ID")
+from src.utils.http_transport import get_search_client  # Per-thread, keep-alive search clients
+from src.utils.search_prefetch import claim_prefetched  # Speculative searches started by the interaction handler
+from src.utils.deadline import DeadlineExceeded, call_with_deadline, report_step_timeout, step_timeout, wait_with_deadline  # Per-step time limits of a turn
 
 ##############################################
 # Define the SearchInput class
@@ -29,38 +26,60 @@ class GoogleSearchTool(BaseTool):
     Class for the Google Search tool, extending LangChain's BaseTool.
 
     This class provides methods for performing synchronous Google searches using the specified API key and CSE ID.
+    Searches go through the calling thread's own search client, so concurrent sessions never share one.
 
     Attributes:
         name (str): Name of the tool.
         description (str): Short description of what the tool does.
         args_schema (Type[BaseModel]): The input validation model assigned to the tool.
-        search (ClassVar[GoogleSearchAPIWrapper]): Wrapper around Google's Search API.
     """
     name: str = "google_search"
     description: str = "Search Google for recent results. Use this tool for current events, today's news, or recent updates."
     args_schema: Type[BaseModel] = SearchInput
-    search: ClassVar[GoogleSearchAPIWrapper] = GoogleSearchAPIWrapper(  # Annotate as ClassVar
-        google_api_key=google_api_key,
-        google_cse_id=google_cse_id
-    )
 
     ##############################################
     # Define the _run method
     # ============================================
+    @report_step_timeout
     def _run(self, query: str, run_manager: Optional[CallbackManagerForToolRun] = None) -> str:  
         """
         Execute a synchronous search query using the tool.
 
-        This method uses the API wrapper to perform a search with the provided query string.
+        This method uses the calling thread's API wrapper to perform a search with the provided query string,
+        unless a matching speculative search for the current turn is already running.
 
         Args:
             query (str): The search query string.
             run_manager (Optional[CallbackManagerForToolRun]): Optional callback manager for tool run.
 
         Returns:
-            str: The search results.
+            str: The search results, or a time-out notice if the search did not finish within the current
+                step of a deadline-bound turn that still has time left.
+
+        Raises:
+            DeadlineExceeded: If the deadline-bound turn itself is out of time.
         """
-        return self.search.run(query)
+        # Take over the speculative search started for this turn if it asked for the same information
+        prefetched = claim_prefetched(query)
+        if prefetched is not None:
+            try:
+                results = wait_with_deadline(prefetched.future)
+            except DeadlineExceeded:
+                prefetched.resolve(used=False)
+                raise
+            except Exception:
+                prefetched.resolve(used=False)  # Fall back to a live search if the speculative one failed
+            else:
+                prefetched.resolve(used=True)
+                return results
+        # Under a deadline, the socket timeout cancels the request when the step's time is up
+        timeout = step_timeout()
+        try:
+            return call_with_deadline(lambda: get_search_client(timeout).run(query))
+        except TimeoutError as error:
+            if timeout is None or isinstance(error, DeadlineExceeded):
+                raise
+            raise DeadlineExceeded(f"Search did not finish within {timeout:.1f}s") from error
 
     ##############################################
     # Define the _arun method
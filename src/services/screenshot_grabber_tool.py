@@ -15,10 +15,11 @@ import time
 from typing import Type
 from screeninfo import get_monitors  # Used to retrieve information about the monitors connected to the system
 import mss  # Reliable multi-monitor screenshot tool
-from PIL import Image  # Used to process raw image data
 from pydantic import BaseModel, Field  # For data validation and settings management
 from langchain.tools import BaseTool  # Base class for creating tools within a certain framework
 from langchain_core.tools import ToolException  # Custom exception for error handling within tools
+from src.utils.deadline import report_step_timeout, wait_with_deadline  # Per-step time limits of a turn
+from src.utils.image_worker import get_image_worker  # Process-pool offload for image encoding
 
 
 ###################################################
@@ -49,6 +50,7 @@ class ScreenshotGrabberTool(BaseTool):
     description: str = "Tool to grab screenshots of the current screen"
     args_schema: Type[BaseModel] = ScreenshotInput
 
+    @report_step_timeout
     def _run(self, monitor_number: int = 1) -> str:
         """
         Takes a screenshot of the specified monitor and saves it to a predefined directory.
@@ -57,10 +59,12 @@ class ScreenshotGrabberTool(BaseTool):
             monitor_number (int): The monitor number from which to capture the screenshot. Defaults to 1.
 
         Returns:
-            str: A message indicating where the screenshot was saved.
+            str: A message indicating where the screenshot was saved, or a time-out notice if saving did not
+                finish within the current step of a deadline-bound turn that still has time left.
         
         Raises:
             ToolException: If an invalid monitor number is specified.
+            DeadlineExceeded: If the deadline-bound turn itself is out of time.
         """
         # Define the directory where screenshots will be saved
         save_directory = os.path.join("screenshot_grabber", "screenshots")
@@ -84,9 +88,8 @@ class ScreenshotGrabberTool(BaseTool):
             monitor = sct.monitors[monitor_number]  # mss uses 1-based index; index 0 is all monitors combined
             screenshot = sct.grab(monitor)
 
-            # Convert raw bytes to image and save
-            img = Image.frombytes("RGB", (screenshot.width, screenshot.height), screenshot.rgb)
-            img.save(file_path)
+        # Convert the raw BGRA grab to RGB and compress it to PNG in the shared worker pool
+        wait_with_deadline(get_image_worker().submit_save_raw_as_png(screenshot.raw, (screenshot.width, screenshot.height), file_path, "BGRX"))
 
         return f"Screenshot saved as {file_path}"
 
@@ -5,59 +5,121 @@ This script imports necessary modules and classes, defines the setup_agent funct
 and binds tools to a ChatOpenAI instance for advanced conversational capabilities.
 
 Functions:
+    create_llm(max_retries): Creates a ChatOpenAI instance for the agent and the best-effort chain.
+    with_step_timeout(llm, bounded_llm): Wraps a language model so each call is limited to the current step's time.
     setup_agent(tools): Configures and returns an AgentExecutor instance with the provided tools.
+    setup_best_effort_chain(): Configures and returns a chain that answers from partial tool observations.
 """
 
 # Import necessary modules and classes from various packages and files
 from langchain_openai.chat_models import ChatOpenAI
+import httpx  # HTTP client used by the OpenAI SDK, whose timeouts surface while streaming
+from openai import APITimeoutError  # Raised by the OpenAI client when a request times out
 from langchain.agents import AgentExecutor, create_openai_tools_agent
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.agents.format_scratchpad.openai_tools import format_to_openai_tool_messages
 from langchain.agents.output_parsers.openai_tools import OpenAIToolsAgentOutputParser
 from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler  
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnableLambda
 from src.prompts.advanced_assistant_prompt import advanced_assistant_prompt  # Custom prompt template for initializing conversation
+from src.prompts.best_effort_prompt import best_effort_prompt  # Prompt for answering when a turn runs out of time
+from src.utils.deadline import DeadlineExceeded, current_deadline, step_timeout  # Time allowed for the current step of a deadline-bound turn
 from src.config.config import get_env_variable  # Function to retrieve environment variables
+from src.utils.http_transport import get_http_client, get_http_timeout  # Shared pooled HTTP transport
 
 
 ##############################################
-# Define the setup_agent function
+# Define the create_llm function
 # ============================================
-def setup_agent(tools):
+def create_llm(max_retries=None):
     """
-    Configures and returns an AgentExecutor instance using OpenAI's GPT models.
-
-    This function:
-    1. Retrieves the OpenAI API key from environment variables.
-    2. Initializes a ChatOpenAI instance with the specified model, API key, and streaming callback.
-    3. Binds the provided tools to the ChatOpenAI instance.
-    4. Defines a structured prompt template for the language model.
-    5. Creates an agent pipeline that processes input, uses the prompt template, queries the language model, and parses the output.
-    6. Returns an AgentExecutor instance configured with the defined agent, tools, and verbosity settings.
+    Creates a ChatOpenAI instance used by the agent and the best-effort chain.
 
     Args:
-        tools (dict): A dictionary of tools to bind to the ChatOpenAI instance.
+        max_retries (int, optional): Number of times the OpenAI client retries a failed or timed-out request.
+            Defaults to None (the client's default).
 
     Returns:
-        AgentExecutor: An instance of AgentExecutor configured with the specified tools and settings.
+        ChatOpenAI: A streaming ChatOpenAI instance on the shared HTTP client.
     """
-    
     # Retrieve the OpenAI API key from environment variables
     openai_api_key = get_env_variable("OPENAI_API_KEY")
 
     # Initialize a ChatOpenAI instance with specific model, API key, and callbacks for streaming output
-    llm = ChatOpenAI(
+    return ChatOpenAI(
         model="gpt-4o",  # Our most advanced, multimodal flagship model that’s cheaper and faster than GPT-4 Turbo. Currently points to gpt-4o-2024-05-13.
         # model="gpt-4.1",  # Specify the model to use (commented lines show other options)
         # model="gpt-3.5-turbo-0125",  # Specify the model to use (commented lines show other options)
         # model="gpt-4-0125-preview", 
         # model="gpt-4",       
         api_key=openai_api_key,  # Use the retrieved API key
+        http_client=get_http_client(),  # Share the pooled keep-alive connections with other sessions
+        timeout=get_http_timeout(),  # Apply the configured connect and read timeouts
+        max_retries=max_retries,  # Retry failed requests, unless the caller bounds them by a deadline
         streaming=True,  # Enable streaming for real-time processing
         callbacks=[StreamingStdOutCallbackHandler()]  # Use a callback handler for streaming output to stdout
     )
 
-    # Bind the ChatOpenAI instance with the provided tools for extended functionality
-    llm_with_tools = llm.bind_tools(list(tools.values()))
+
+##############################################
+# Define the with_step_timeout function
+# ============================================
+def with_step_timeout(llm, bounded_llm):
+    """
+    Wraps a language model so each call is limited to the time of the current step of a deadline-bound turn.
+
+    Deadline-bound calls go to a model whose client does not retry: every retry would get the full
+    step timeout again and run past the step's share of the budget.
+
+    Args:
+        llm (Runnable): The language model used outside of a deadline-bound turn.
+        bounded_llm (Runnable): The same language model on a client without retries, used under a deadline.
+
+    Returns:
+        RunnableLambda: A runnable that invokes the language model with the step's timeout, if any,
+            and raises DeadlineExceeded when the request times out.
+    """
+    def invoke(messages, config):
+        timeout = step_timeout()  # Raises DeadlineExceeded once the turn is out of time
+        if timeout is None:
+            # Unbounded turns keep the client's configured timeouts
+            return llm.invoke(messages, config)
+        try:
+            # The request is aborted by the HTTP client when the step's time is up
+            return bounded_llm.invoke(messages, config, timeout=timeout)
+        except (APITimeoutError, httpx.TimeoutException) as error:
+            # Stalls while the streamed body is read surface as httpx timeouts rather than APITimeoutError
+            current_deadline().record_step_timeout("model")
+            raise DeadlineExceeded(f"Model call did not finish within {timeout:.1f}s") from error
+    return RunnableLambda(invoke)
+
+
+##############################################
+# Define the setup_agent function
+# ============================================
+def setup_agent(tools):
+    """
+    Configures and returns an AgentExecutor instance using OpenAI's GPT models.
+
+    This function:
+    1. Creates ChatOpenAI instances with the specified model, API key, shared HTTP client, and streaming callback,
+       one of them without retries for deadline-bound turns.
+    2. Binds the provided tools to the ChatOpenAI instances.
+    3. Defines a structured prompt template for the language model.
+    4. Creates an agent pipeline that processes input, uses the prompt template, queries the language model
+       within the time of the current step, and parses the output.
+    5. Returns an AgentExecutor instance configured with the defined agent, tools, and verbosity settings.
+
+    Args:
+        tools (dict): A dictionary of tools to bind to the ChatOpenAI instance.
+
+    Returns:
+        AgentExecutor: An instance of AgentExecutor configured with the specified tools and settings.
+    """
+    # Bind the ChatOpenAI instances with the provided tools for extended functionality
+    llm_with_tools = create_llm().bind_tools(list(tools.values()))
+    bounded_llm_with_tools = create_llm(max_retries=0).bind_tools(list(tools.values()))
 
     # Define a prompt template that structures the input for the language model
     prompt = ChatPromptTemplate.from_messages([
@@ -75,7 +137,7 @@ def setup_agent(tools):
             "chat_history": lambda x: x["chat_history"],  # Pass through the conversation history
         }
         | prompt  # Apply the prompt template to structure the input for the language model
-        | llm_with_tools  # Query the language model with tools bound
+        | with_step_timeout(llm_with_tools, bounded_llm_with_tools)  # Query the language model with tools bound
         | OpenAIToolsAgentOutputParser()  # Parse the output from the language model
     )
 
@@ -85,3 +147,24 @@ def setup_agent(tools):
         tools=list(tools.values()), 
         verbose=False  # Enable verbose output for debugging or informational purposes
     )
+
+
+##############################################
+# Define the setup_best_effort_chain function
+# ============================================
+def setup_best_effort_chain():
+    """
+    Configures and returns a chain that answers the user from partial tool observations.
+
+    The chain is used when a deadline-bound turn runs out of time. It queries the language model
+    without tools, within the time of the current step, and returns the answer as a string.
+
+    Returns:
+        Runnable: A chain taking input, chat_history and observations, and returning the answer text.
+    """
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", best_effort_prompt),  # System-level message explaining the partial observations
+        MessagesPlaceholder(variable_name="chat_history"),  # Placeholder for the conversation history
+        ("user", "{input}"),  # Placeholder for the user's input
+    ])
+    return prompt | with_step_timeout(create_llm(), create_llm(max_retries=0)) | StrOutputParser()
@@ -0,0 +1,367 @@
+"""
+Module for bounding the time spent on a conversation turn.
+
+A Deadline is activated for a turn with deadline_scope(). Model calls and tool calls made
+inside the turn read it with step_timeout(), which gives each step a share of the time left
+while holding back a reserve for a best-effort answer. Blocking calls are run through
+call_with_deadline(), which stops waiting when the step's time is up and raises DeadlineExceeded;
+callers also pass step_timeout() down to the request itself so the transport cancels it.
+Tools decorated with report_step_timeout() hand a timed-out step back to the agent as an
+observation while the turn still has time, and every step that ran out of time is
+recorded on the deadline so the turn's result can report it. Cancelling a deadline makes every later step
+in the turn fail immediately.
+
+The worker threads are configured through environment variables:
+    DEADLINE_WORKERS: Number of threads running deadline-bound calls. Defaults to 32.
+
+Classes:
+    DeadlineExceeded(TimeoutError): Raised when a turn or one of its steps runs out of time.
+    Deadline: Time budget of a single turn.
+
+Functions:
+    deadline_scope(deadline): Context manager that activates a deadline for the current context.
+    current_deadline(): Returns the deadline active in the current context, if any.
+    step_timeout(): Returns the number of seconds the next step may take.
+    wait_with_deadline(future): Waits for a future within the time of the current step.
+    call_with_deadline(fn, *args, **kwargs): Runs a blocking call within the time of the current step.
+    run_until_deadline(fn, deadline): Runs a turn in a background thread until its deadline.
+    report_step_timeout(run): Decorates a tool's _run method to report step time-outs as observations.
+"""
+
+# Import necessary modules from the standard library
+import time
+import atexit
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from src.config.config import get_env_variable  # Function to retrieve environment variables
+
+# Load necessary configuration values from the environment
+deadline_workers = int(get_env_variable("DEADLINE_WORKERS", 32))
+
+
+##############################################
+# Define the DeadlineExceeded class
+# ============================================
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when a turn or one of its steps runs out of time.
+    """
+
+
+##############################################
+# Define the Deadline class
+# ============================================
+class Deadline:
+    """
+    Time budget of a single turn.
+
+    Part of the budget is held back as a reserve for producing a best-effort answer. Each step
+    may use at most a share of the remaining time before the reserve, so a single hung call
+    cannot consume the whole turn.
+
+    Attributes:
+        budget (float): Total number of seconds allowed for the turn.
+        reserve (float): Number of seconds held back for the best-effort answer.
+        step_share (float): Fraction of the remaining usable time a single step may take.
+        cancelled (bool): Whether the turn has been abandoned.
+        timed_out_steps (list): Names of the steps that ran out of their share of time, in order.
+    """
+    def __init__(self, budget, reserve=0.2, step_share=0.5):
+        """
+        Start the deadline clock.
+
+        Args:
+            budget (float): Total number of seconds allowed for the turn.
+            reserve (float, optional): Fraction of the budget held back for the best-effort answer. Defaults to 0.2.
+            step_share (float, optional): Fraction of the remaining usable time a single step may take. Defaults to 0.5.
+        """
+        self.budget = budget
+        self.reserve = budget * reserve
+        self.step_share = step_share
+        self.cancelled = False
+        self.timed_out_steps = []
+        self._started_at = time.monotonic()
+
+
+    ##############################################
+    # Define the time accounting methods
+    # ============================================
+    def elapsed(self):
+        """
+        Return the number of seconds since the deadline was started.
+
+        Returns:
+            float: The elapsed seconds.
+        """
+        return time.monotonic() - self._started_at
+
+
+    def remaining(self):
+        """
+        Return the number of seconds left before the deadline, including the reserve.
+
+        Returns:
+            float: The remaining seconds, never negative.
+        """
+        return max(0.0, self.budget - self.elapsed())
+
+
+    def usable(self):
+        """
+        Return the number of seconds left for the turn's steps before the reserve.
+
+        Returns:
+            float: The usable seconds, never negative.
+        """
+        return max(0.0, self.remaining() - self.reserve)
+
+
+    def expired(self):
+        """
+        Check whether the turn can no longer start another step.
+
+        Returns:
+            bool: True if the deadline was cancelled or no usable time is left.
+        """
+        return self.cancelled or self.usable() <= 0
+
+
+    ##############################################
+    # Define the step_timeout method
+    # ============================================
+    def step_timeout(self):
+        """
+        Return the number of seconds the next step may take.
+
+        Returns:
+            float: The step's share of the usable time.
+
+        Raises:
+            DeadlineExceeded: If the turn can no longer start another step.
+        """
+        if self.expired():
+            raise DeadlineExceeded(f"Turn deadline of {self.budget:.1f}s exceeded")
+        return self.usable() * self.step_share
+
+
+    ##############################################
+    # Define the cancel method
+    # ============================================
+    def cancel(self):
+        """
+        Abandon the turn, making every later step fail immediately.
+        """
+        self.cancelled = True
+
+
+    ##############################################
+    # Define the record_step_timeout method
+    # ============================================
+    def record_step_timeout(self, name):
+        """
+        Record that a step of the turn ran out of its share of time.
+
+        Args:
+            name (str): The name of the step, e.g. the tool name or "model".
+        """
+        self.timed_out_steps.append(name)
+
+
+# Deadline active in the current context, and the shared executor for deadline-bound calls
+_current_deadline = contextvars.ContextVar("current_deadline", default=None)
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """
+    Return the shared executor for deadline-bound calls, creating it on first use.
+
+    Returns:
+        ThreadPoolExecutor: The shared executor.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=deadline_workers, thread_name_prefix="deadline")
+            atexit.register(_executor.shutdown, wait=False)
+        return _executor
+
+
+##############################################
+# Define the deadline_scope function
+# ============================================
+@contextmanager
+def deadline_scope(deadline):
+    """
+    Activate a deadline for the current context.
+
+    Args:
+        deadline (Deadline): The deadline to activate, or None to leave the context unbounded.
+
+    Yields:
+        Deadline: The activated deadline.
+    """
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+##############################################
+# Define the current_deadline function
+# ============================================
+def current_deadline():
+    """
+    Return the deadline active in the current context.
+
+    Returns:
+        Deadline: The active deadline, or None if the context is unbounded.
+    """
+    return _current_deadline.get()
+
+
+##############################################
+# Define the step_timeout function
+# ============================================
+def step_timeout():
+    """
+    Return the number of seconds the next step may take under the active deadline.
+
+    Returns:
+        float: The step's share of the usable time, or None if the context is unbounded.
+
+    Raises:
+        DeadlineExceeded: If the active deadline can no longer start another step.
+    """
+    deadline = current_deadline()
+    return None if deadline is None else deadline.step_timeout()
+
+
+##############################################
+# Define the wait_with_deadline function
+# ============================================
+def wait_with_deadline(future):
+    """
+    Wait for a future within the time of the current step.
+
+    Args:
+        future (Future): The future to wait for.
+
+    Returns:
+        any: The result of the future.
+
+    Raises:
+        DeadlineExceeded: If the future does not finish within the step's time. Exceptions raised
+            by the call itself, including its own timeouts, are passed through unchanged.
+    """
+    timeout = step_timeout()
+    # Only wait here; the outcome is read from the future, so its own errors are never mistaken for ours
+    wait([future], timeout=timeout)
+    if not future.done():
+        future.cancel()  # Drop the call if it has not started yet
+        raise DeadlineExceeded(f"Step did not finish within {timeout:.1f}s")
+    return future.result()
+
+
+##############################################
+# Define the call_with_deadline function
+# ============================================
+def call_with_deadline(fn, *args, **kwargs):
+    """
+    Run a blocking call within the time of the current step.
+
+    Without an active deadline the call runs directly in the calling thread. Otherwise it runs
+    in a shared worker thread, in a copy of the current context, and is abandoned when the
+    step's time is up; its own transport timeouts bound how long it keeps running.
+
+    Args:
+        fn (callable): The blocking function to call.
+        *args: Positional arguments passed to the function.
+        **kwargs: Keyword arguments passed to the function.
+
+    Returns:
+        any: The return value of the function.
+
+    Raises:
+        DeadlineExceeded: If the call does not finish within the step's time.
+    """
+    if current_deadline() is None:
+        return fn(*args, **kwargs)
+    context = contextvars.copy_context()
+    return wait_with_deadline(_get_executor().submit(context.run, fn, *args, **kwargs))
+
+
+##############################################
+# Define the run_until_deadline function
+# ============================================
+def run_until_deadline(fn, deadline):
+    """
+    Run a turn in a background thread and stop waiting for it at the deadline's reserve.
+
+    The turn runs in a copy of the current context with the deadline active. If it does not
+    finish in time the deadline is cancelled, so the turn stops at its next step.
+
+    Args:
+        fn (callable): The function running the turn.
+        deadline (Deadline): The deadline of the turn.
+
+    Returns:
+        any: The return value of the function.
+
+    Raises:
+        DeadlineExceeded: If the turn does not finish before the reserve is reached. Exceptions
+            raised by the turn itself are passed through unchanged.
+    """
+    future = Future()
+
+    def run_turn():
+        with deadline_scope(deadline):
+            try:
+                future.set_result(fn())
+            except BaseException as error:
+                future.set_exception(error)
+
+    context = contextvars.copy_context()
+    # A daemon thread per turn, so an abandoned turn never blocks the interpreter from exiting
+    threading.Thread(target=context.run, args=(run_turn,), daemon=True, name="turn").start()
+    wait([future], timeout=deadline.usable())
+    if not future.done():
+        deadline.cancel()
+        raise DeadlineExceeded(f"Turn deadline of {deadline.budget:.1f}s exceeded")
+    return future.result()
+
+
+##############################################
+# Define the report_step_timeout function
+# ============================================
+def report_step_timeout(run):
+    """
+    Decorates a tool's _run method so a step that runs out of time becomes an observation.
+
+    When a call inside the tool raises DeadlineExceeded but the turn still has usable time,
+    the tool returns a message saying so, and the agent can carry on without the result. The
+    time-out is recorded on the deadline under the tool's name.
+    Once the turn itself is out of time, the error is raised to end the turn.
+
+    Args:
+        run (callable): The tool's _run method.
+
+    Returns:
+        callable: The decorated _run method.
+    """
+    @functools.wraps(run)
+    def run_with_report(self, *args, **kwargs):
+        try:
+            return run(self, *args, **kwargs)
+        except DeadlineExceeded as error:
+            deadline = current_deadline()
+            if deadline is None or deadline.expired():
+                raise
+            deadline.record_step_timeout(self.name)
+            return f"The {self.name} tool was cancelled because it took too long ({error}). Continue without its result."
+    return run_with_report
@@ -0,0 +1,306 @@
+"""
+Module for sharing HTTP transports between the search and model clients.
+
+Every provider client used by the agent goes through this module, so concurrent sessions
+reuse warm keep-alive connections instead of paying a TLS handshake per request:
+
+    - OpenAI requests share one pooled, thread-safe httpx.Client.
+    - Google Custom Search uses one GoogleSearchAPIWrapper per thread, each backed by its own
+      keep-alive httplib2.Http, because httplib2 and googleapiclient are not thread-safe.
+    - Gemini requests share one ChatGoogleGenerativeAI client per model, whose channel is
+      reused across calls and threads.
+
+Connection reuse of the httpx pool and the search clients is recorded per host and can be
+read with get_connection_metrics(). Gemini is not included: its gRPC channel manages its
+own connections and does not expose when it reconnects.
+
+The transports are configured through environment variables:
+    HTTP_POOL_MAX_CONNECTIONS: Maximum number of open connections in the shared pool. Defaults to 100.
+    HTTP_POOL_MAX_KEEPALIVE: Maximum number of idle keep-alive connections kept in the pool. Defaults to 20.
+    HTTP_KEEPALIVE_EXPIRY: Seconds an idle keep-alive connection is kept open. Defaults to 30.
+    HTTP_CONNECT_TIMEOUT: Seconds allowed to establish a connection. Defaults to 5.
+    HTTP_READ_TIMEOUT: Seconds allowed to wait for response data. Defaults to 60.
+
+Classes:
+    ConnectionMetrics: Thread-safe per-host counters of requests and newly opened connections.
+    MeteredHttp: httplib2.Http subclass that records connection reuse.
+
+Functions:
+    get_http_client(): Returns the shared, pooled httpx.Client.
+    get_http_timeout(): Returns the configured httpx.Timeout.
+    get_search_client(timeout): Returns the GoogleSearchAPIWrapper owned by the calling thread.
+    get_gemini_client(model): Returns the shared ChatGoogleGenerativeAI client for a model.
+    get_connection_metrics(): Returns a snapshot of the connection reuse metrics.
+"""
+
+# Import necessary modules from the standard library and third-party packages
+import atexit
+import threading
+import weakref
+from urllib.parse import urlsplit
+import httpx  # Pooled, thread-safe HTTP client used by the OpenAI SDK
+import httplib2  # HTTP library used by googleapiclient
+from googleapiclient.discovery import build  # Builds the Custom Search service object
+from langchain_google_community import GoogleSearchAPIWrapper
+from langchain_google_genai import ChatGoogleGenerativeAI  # Wrapper for interacting with Google's Generative AI
+from src.config.config import get_env_variable  # Function to retrieve environment variables
+
+# Load necessary configuration values from the environment
+google_api_key = get_env_variable("GOOGLE_API_KEY")
+google_cse_id = get_env_variable("GOOGLE_CSE_ID")
+max_connections = int(get_env_variable("HTTP_POOL_MAX_CONNECTIONS", 100))
+max_keepalive_connections = int(get_env_variable("HTTP_POOL_MAX_KEEPALIVE", 20))
+keepalive_expiry = float(get_env_variable("HTTP_KEEPALIVE_EXPIRY", 30))
+connect_timeout = float(get_env_variable("HTTP_CONNECT_TIMEOUT", 5))
+read_timeout = float(get_env_variable("HTTP_READ_TIMEOUT", 60))
+
+
+##############################################
+# Define the ConnectionMetrics class
+# ============================================
+class ConnectionMetrics:
+    """
+    Thread-safe per-host counters of requests and newly opened connections.
+
+    Requests that did not open a new connection were served over a reused keep-alive connection.
+    """
+    def __init__(self):
+        """
+        Initialize empty counters.
+        """
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+
+    ##############################################
+    # Define the record method
+    # ============================================
+    def record(self, host, new_connection):
+        """
+        Record one request sent to a host.
+
+        Args:
+            host (str): The host the request was sent to.
+            new_connection (bool): Whether the request had to open a new connection.
+        """
+        with self._lock:
+            counters = self._hosts.setdefault(host, {"requests": 0, "connections_opened": 0})
+            counters["requests"] += 1
+            counters["connections_opened"] += int(new_connection)
+
+
+    ##############################################
+    # Define the snapshot method
+    # ============================================
+    def snapshot(self):
+        """
+        Return a copy of the counters with the derived reuse figures.
+
+        Returns:
+            dict: Per-host dictionaries with requests, connections_opened, connections_reused and reuse_ratio.
+        """
+        with self._lock:
+            snapshot = {}
+            for host, counters in self._hosts.items():
+                reused = counters["requests"] - counters["connections_opened"]
+                snapshot[host] = {
+                    **counters,
+                    "connections_reused": reused,
+                    "reuse_ratio": reused / counters["requests"] if counters["requests"] else 0.0,
+                }
+            return snapshot
+
+
+# Process-wide connection reuse metrics shared by every transport
+_metrics = ConnectionMetrics()
+
+
+##############################################
+# Define the MeteredHttp class
+# ============================================
+class MeteredHttp(httplib2.Http):
+    """
+    httplib2.Http subclass that records whether each request opened a new connection.
+
+    httplib2 keeps one keep-alive connection per scheme and authority in its connections cache,
+    so a request that adds a cache entry or replaces a socket had to open a new connection.
+    """
+    def request(self, uri, *args, **kwargs):
+        """
+        Send a request and record connection reuse for its host.
+
+        Args:
+            uri (str): The URI to request.
+            *args: Positional arguments forwarded to httplib2.Http.request.
+            **kwargs: Keyword arguments forwarded to httplib2.Http.request.
+
+        Returns:
+            tuple: The response and content returned by httplib2.Http.request.
+        """
+        open_sockets = {key: conn.sock for key, conn in self.connections.items()}
+        response = super().request(uri, *args, **kwargs)
+        # A connection is new when its cache entry or its socket did not exist before the request
+        new_connection = any(
+            conn.sock is not None and conn.sock is not open_sockets.get(key)
+            for key, conn in self.connections.items()
+        )
+        _metrics.record(urlsplit(uri).hostname, new_connection)
+        return response
+
+
+    ##############################################
+    # Define the set_timeout method
+    # ============================================
+    def set_timeout(self, timeout):
+        """
+        Set the socket timeout for new and already open keep-alive connections.
+
+        Args:
+            timeout (float): The socket timeout in seconds.
+        """
+        self.timeout = timeout
+        for conn in self.connections.values():
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+
+
+# Shared clients, the per-thread search clients and the lock guarding their lazy creation
+_http_client = None
+_gemini_clients = {}
+_thread_local = threading.local()
+_clients_lock = threading.Lock()
+
+# Network streams already seen by the shared httpx client, used to detect new connections
+_seen_streams = weakref.WeakSet()
+_seen_streams_lock = threading.Lock()
+
+
+##############################################
+# Define the get_http_timeout function
+# ============================================
+def get_http_timeout():
+    """
+    Return the configured timeouts for pooled HTTP requests.
+
+    Returns:
+        httpx.Timeout: The connect, read, write and pool timeouts.
+    """
+    return httpx.Timeout(read_timeout, connect=connect_timeout)
+
+
+##############################################
+# Define the _record_httpx_response function
+# ============================================
+def _record_httpx_response(response):
+    """
+    Response hook that records whether an httpx request opened a new connection.
+
+    Args:
+        response (httpx.Response): The received response.
+    """
+    stream = response.extensions.get("network_stream")
+    if stream is None:
+        new_connection = False
+    else:
+        with _seen_streams_lock:
+            new_connection = stream not in _seen_streams
+            _seen_streams.add(stream)
+    _metrics.record(response.request.url.host, new_connection)
+
+
+##############################################
+# Define the get_http_client function
+# ============================================
+def get_http_client():
+    """
+    Return the shared, pooled httpx.Client, creating it on first use.
+
+    The client is thread-safe and keeps idle connections alive, so all sessions share warm connections.
+
+    Returns:
+        httpx.Client: The shared HTTP client.
+    """
+    global _http_client
+    with _clients_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive_connections,
+                    keepalive_expiry=keepalive_expiry,
+                ),
+                timeout=get_http_timeout(),
+                event_hooks={"response": [_record_httpx_response]},
+            )
+            atexit.register(_http_client.close)  # Close pooled connections when the interpreter exits
+        return _http_client
+
+
+##############################################
+# Define the get_search_client function
+# ============================================
+def get_search_client(timeout=None):
+    """
+    Return the Google Search API wrapper owned by the calling thread, creating it on first use.
+
+    Each thread gets its own wrapper and keep-alive httplib2.Http, so searches from concurrent
+    sessions never share a non-thread-safe client.
+
+    Args:
+        timeout (float, optional): Socket timeout in seconds for the next searches on this thread.
+            Defaults to None, which applies HTTP_READ_TIMEOUT.
+
+    Returns:
+        GoogleSearchAPIWrapper: The calling thread's search client.
+    """
+    search = getattr(_thread_local, "search", None)
+    if search is None:
+        search = GoogleSearchAPIWrapper(google_api_key=google_api_key, google_cse_id=google_cse_id)
+        _thread_local.http = MeteredHttp(timeout=read_timeout)
+        # Rebuild the service on top of a metered keep-alive connection owned by this thread
+        search.search_engine = build(
+            "customsearch", "v1",
+            developerKey=google_api_key,
+            http=_thread_local.http,
+            cache_discovery=False,
+        )
+        _thread_local.search = search
+    _thread_local.http.set_timeout(read_timeout if timeout is None else timeout)
+    return search
+
+
+##############################################
+# Define the get_gemini_client function
+# ============================================
+def get_gemini_client(model="gemini-1.5-flash"):
+    """
+    Return the shared Gemini chat client for a model, creating it on first use.
+
+    The client's gRPC channel is not covered by the connection reuse metrics.
+
+    Args:
+        model (str, optional): The Gemini model name. Defaults to "gemini-1.5-flash".
+
+    Returns:
+        ChatGoogleGenerativeAI: The shared Gemini client.
+    """
+    with _clients_lock:
+        llm = _gemini_clients.get(model)
+        if llm is None:
+            llm = ChatGoogleGenerativeAI(model=model, api_key=google_api_key, timeout=read_timeout)
+            _gemini_clients[model] = llm
+    return llm
+
+
+##############################################
+# Define the get_connection_metrics function
+# ============================================
+def get_connection_metrics():
+    """
+    Return a snapshot of the connection reuse metrics of the httpx pool and the search clients.
+
+    Returns:
+        dict: Per-host dictionaries with requests, connections_opened, connections_reused and reuse_ratio.
+    """
+    return _metrics.snapshot()
@@ -0,0 +1,290 @@
+"""
+Module for offloading CPU-bound image work to a shared process pool.
+
+Decoding, re-encoding, PNG compression and base64 encoding of images all hold the GIL,
+so running them in the calling thread serializes every concurrent session in the process.
+This module provides a process-pool backed worker that the image tools submit jobs to.
+Large raw pixel buffers are handed to the workers through shared memory blocks instead
+of being pickled across the process boundary.
+
+The pool is configured through environment variables:
+    IMAGE_WORKER_PROCESSES: Number of worker processes. Defaults to the number of CPUs.
+        Set to 0 to run every job inline in the calling thread.
+
+Classes:
+    ImageWorkerPool: Process pool that runs image encoding jobs off the calling thread.
+
+Functions:
+    get_image_worker(): Returns the shared, lazily created ImageWorkerPool instance.
+    encode_image_file(file_path): Re-encodes an image file and returns its MIME type and bytes.
+    encode_data_url(mime_type, data): Encodes image bytes as a base64 data URL.
+    save_raw_as_png(raw, size, file_path, raw_mode): Converts raw pixel data to an image and saves it as PNG.
+"""
+
+# Import necessary modules from the standard library and third-party packages
+import io
+import os
+import atexit
+import base64
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from PIL import Image  # Python Imaging Library for opening and manipulating images
+from src.config.config import get_env_variable  # Function to retrieve environment variables
+
+
+##############################################
+# Define the encode_image_file function
+# ============================================
+def encode_image_file(file_path):
+    """
+    Open an image file and re-encode it into a format accepted by the vision APIs.
+
+    JPEG and PNG images keep their format; every other format is converted to JPEG.
+
+    Args:
+        file_path (str): The path to the image file.
+
+    Returns:
+        tuple: The MIME type of the encoded image and the encoded image bytes.
+    """
+    # Open the image file, automatically detecting and managing its format
+    with Image.open(file_path) as img:
+        file_format = img.format.lower()  # Determine the image format
+        buffer = io.BytesIO()  # Create an in-memory byte stream to store the image data
+        # Save the image to the byte stream, converting if necessary
+        img.save(buffer, format=file_format.upper() if file_format in ['jpeg', 'png'] else "JPEG")
+        # Determine the MIME type for the image, defaulting to JPEG if unknown
+        mime_type = f"image/{file_format}" if file_format in ['jpeg', 'png'] else "image/jpeg"
+    return mime_type, buffer.getvalue()
+
+
+##############################################
+# Define the encode_data_url function
+# ============================================
+def encode_data_url(mime_type, data):
+    """
+    Encode image bytes in base64 and format them as a data URL.
+
+    Args:
+        mime_type (str): The MIME type of the image.
+        data (bytes): The encoded image bytes.
+
+    Returns:
+        str: The image data in data URL format.
+    """
+    base64_data = base64.b64encode(data).decode('utf-8')
+    return f"data:{mime_type};base64,{base64_data}"
+
+
+##############################################
+# Define the save_raw_as_png function
+# ============================================
+def save_raw_as_png(raw, size, file_path, raw_mode="RGB"):
+    """
+    Convert raw pixel data to an RGB image and save it as a PNG file.
+
+    Args:
+        raw (bytes-like): The raw pixel data.
+        size (tuple): The width and height of the image in pixels.
+        file_path (str): The path where the PNG file will be written.
+        raw_mode (str, optional): The PIL raw decoder mode of the pixel data, e.g. "BGRX" for mss grabs. Defaults to "RGB".
+
+    Returns:
+        str: The path of the saved file.
+    """
+    img = Image.frombytes("RGB", size, raw, "raw", raw_mode)
+    img.save(file_path, format="PNG")
+    return file_path
+
+
+##############################################
+# Define the worker-side job functions
+# ============================================
+def _data_url_job(file_path):
+    """
+    Worker job that encodes an image file as a base64 data URL.
+
+    Args:
+        file_path (str): The path to the image file.
+
+    Returns:
+        str: The image data in data URL format.
+    """
+    return encode_data_url(*encode_image_file(file_path))
+
+
+def _save_raw_job(shm_name, length, size, file_path, raw_mode):
+    """
+    Worker job that reads raw pixel data from shared memory and saves it as a PNG file.
+
+    Args:
+        shm_name (str): The name of the shared memory block holding the pixel data.
+        length (int): The number of bytes of pixel data in the block.
+        size (tuple): The width and height of the image in pixels.
+        file_path (str): The path where the PNG file will be written.
+        raw_mode (str): The PIL raw decoder mode of the pixel data.
+
+    Returns:
+        str: The path of the saved file.
+    """
+    # Workers share the submitting process's resource tracker, so attaching here does not add a
+    # second registration; the submitting side owns the block and unlinks it
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        with shm.buf[:length] as raw:
+            return save_raw_as_png(raw, size, file_path, raw_mode)
+    finally:
+        shm.close()
+
+
+def _run_inline(fn, *args):
+    """
+    Run a job in the calling thread and wrap its outcome in a finished future.
+
+    Args:
+        fn (callable): The job function.
+        *args: Positional arguments passed to the job function.
+
+    Returns:
+        Future: A finished future holding the job's result or exception.
+    """
+    future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as error:
+        future.set_exception(error)
+    return future
+
+
+def _release(shm):
+    """
+    Close and unlink a shared memory block owned by the submitting side.
+
+    Args:
+        shm (SharedMemory): The block to release.
+    """
+    shm.close()
+    shm.unlink()
+
+
+##############################################
+# Define the ImageWorkerPool class
+# ============================================
+class ImageWorkerPool:
+    """
+    Process pool that runs CPU-bound image jobs off the calling thread.
+
+    Raw pixel data sent to the workers travels through shared memory blocks, so only small
+    descriptors are pickled. Workers are started with the forkserver method where available,
+    and spawn otherwise. When the pool is created with zero processes, every job runs inline
+    in the calling thread.
+
+    Attributes:
+        processes (int): Number of worker processes, or 0 when jobs run inline.
+    """
+    def __init__(self, processes=None):
+        """
+        Initialize the worker pool.
+
+        Args:
+            processes (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        """
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        # Start workers from a clean server process instead of forking this one, which runs
+        # HTTP, prefetch and deadline threads and a gRPC channel that do not survive a fork
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context(start_method),
+        ) if self.processes > 0 else None
+
+
+    ##############################################
+    # Define the submit_data_url method
+    # ============================================
+    def submit_data_url(self, file_path):
+        """
+        Submit a job encoding an image file as a base64 data URL.
+
+        Args:
+            file_path (str): The path to the image file.
+
+        Returns:
+            Future: A future resolving to the image data in data URL format.
+        """
+        if self._executor is None:
+            return _run_inline(_data_url_job, file_path)
+        return self._executor.submit(_data_url_job, file_path)
+
+
+    ##############################################
+    # Define the submit_save_raw_as_png method
+    # ============================================
+    def submit_save_raw_as_png(self, raw, size, file_path, raw_mode="RGB"):
+        """
+        Submit a job converting raw pixel data to an RGB image and saving it as a PNG file.
+
+        The shared memory block holding the pixel data is released as soon as the job finishes or is cancelled.
+
+        Args:
+            raw (bytes-like): The raw pixel data.
+            size (tuple): The width and height of the image in pixels.
+            file_path (str): The path where the PNG file will be written.
+            raw_mode (str, optional): The PIL raw decoder mode of the pixel data. Defaults to "RGB".
+
+        Returns:
+            Future: A future resolving to the path of the saved file.
+        """
+        if self._executor is None:
+            return _run_inline(save_raw_as_png, raw, size, file_path, raw_mode)
+
+        # Hand the pixel data to the worker through shared memory instead of pickling it
+        length = len(raw)
+        shm = shared_memory.SharedMemory(create=True, size=max(length, 1))
+        try:
+            shm.buf[:length] = raw
+            future = self._executor.submit(_save_raw_job, shm.name, length, size, file_path, raw_mode)
+        except BaseException:
+            _release(shm)
+            raise
+        future.add_done_callback(lambda _: _release(shm))
+        return future
+
+
+    ##############################################
+    # Define the shutdown method
+    # ============================================
+    def shutdown(self):
+        """
+        Shut down the worker processes, waiting for running jobs to finish.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+
+# Shared pool instance and the lock guarding its lazy creation
+_image_worker = None
+_image_worker_lock = threading.Lock()
+
+
+##############################################
+# Define the get_image_worker function
+# ============================================
+def get_image_worker():
+    """
+    Return the shared image worker pool, creating it on first use.
+
+    The pool size is read from the IMAGE_WORKER_PROCESSES environment variable.
+
+    Returns:
+        ImageWorkerPool: The shared image worker pool.
+    """
+    global _image_worker
+    with _image_worker_lock:
+        if _image_worker is None:
+            processes = get_env_variable("IMAGE_WORKER_PROCESSES")
+            _image_worker = ImageWorkerPool(int(processes) if processes else None)
+            atexit.register(_image_worker.shutdown)  # Stop the worker processes when the interpreter exits
+        return _image_worker
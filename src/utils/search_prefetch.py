@@ -0,0 +1,323 @@
+"""
+Module for speculatively prefetching Google searches while the model decides what to do.
+
+The assistant prompt requires a google_search call for requests mentioning phrases such as
+"today", "latest" or "breaking news". For those inputs the search can start concurrently with
+the first model call instead of after it. When the model then calls google_search with a
+query close enough to the speculative one, the tool takes over the already-running result;
+otherwise the speculative result is dropped. Each speculative search is counted exactly once,
+as a hit, a miss or dropped.
+
+The prefetch is configured through environment variables:
+    SEARCH_PREFETCH_WORKERS: Number of threads running speculative searches. Defaults to 4.
+    SEARCH_PREFETCH_MIN_OVERLAP: Fraction of the model's query words that must appear in the
+        speculative query for the prefetched result to be used. Defaults to 0.6.
+
+Classes:
+    PrefetchMetrics: Thread-safe counters of speculative search outcomes.
+    SpeculativeSearch: A speculative search running in the background.
+
+Functions:
+    should_prefetch(text): Checks whether the text contains a search trigger phrase.
+    speculative_search(query): Context manager that runs a speculative search for the duration of a turn.
+    claim_prefetched(query): Hands the running speculative search to a matching google_search call.
+    get_prefetch_metrics(): Returns a snapshot of the speculative search metrics.
+"""
+
+# Import necessary modules from the standard library
+import re
+import atexit
+import threading
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from src.config.config import get_env_variable  # Function to retrieve environment variables
+from src.prompts.advanced_assistant_prompt import search_trigger_phrases, search_trigger_topics  # Inputs that require a search
+from src.utils.http_transport import get_search_client  # Per-thread, keep-alive search clients
+
+# Load necessary configuration values from the environment
+prefetch_workers = int(get_env_variable("SEARCH_PREFETCH_WORKERS", 4))
+min_overlap = float(get_env_variable("SEARCH_PREFETCH_MIN_OVERLAP", 0.6))
+
+# Pattern matching any trigger phrase or topic as whole words
+_trigger_pattern = re.compile(
+    r"\b(?:" + "|".join(re.escape(phrase) for phrase in search_trigger_phrases + search_trigger_topics) + r")\b",
+    re.IGNORECASE,
+)
+
+
+##############################################
+# Define the PrefetchMetrics class
+# ============================================
+class PrefetchMetrics:
+    """
+    Thread-safe counters of speculative search outcomes.
+
+    Each started speculative search gets exactly one outcome: a hit when its result was returned
+    to a google_search call, a miss when google_search was called during the turn but the result
+    was not used (unrelated query, failed or too slow search), and dropped when google_search
+    was not called at all.
+    """
+    def __init__(self):
+        """
+        Initialize empty counters.
+        """
+        self._lock = threading.Lock()
+        self._counters = {"started": 0, "hits": 0, "misses": 0, "dropped": 0}
+
+
+    ##############################################
+    # Define the record method
+    # ============================================
+    def record(self, outcome):
+        """
+        Increment the counter of an outcome.
+
+        Args:
+            outcome (str): One of "started", "hits", "misses" or "dropped".
+        """
+        with self._lock:
+            self._counters[outcome] += 1
+
+
+    ##############################################
+    # Define the snapshot method
+    # ============================================
+    def snapshot(self):
+        """
+        Return a copy of the counters with the derived hit rate.
+
+        Returns:
+            dict: The started, hits, misses and dropped counters and the hit_rate.
+        """
+        with self._lock:
+            started = self._counters["started"]
+            return {**self._counters, "hit_rate": self._counters["hits"] / started if started else 0.0}
+
+
+##############################################
+# Define the SpeculativeSearch class
+# ============================================
+class SpeculativeSearch:
+    """
+    A speculative search running in the background.
+
+    Attributes:
+        query (str): The query the search was started with.
+        future (Future): The future resolving to the search results.
+        claimed (bool): Whether a google_search call has taken over the result.
+        outcome (str): The recorded outcome, or None while it is still open.
+    """
+    def __init__(self, query, future):
+        """
+        Initialize the speculative search.
+
+        Args:
+            query (str): The query the search was started with.
+            future (Future): The future resolving to the search results.
+        """
+        self.query = query
+        self.future = future
+        self.claimed = False
+        self.outcome = None
+        self._requested = False  # Whether google_search was called with an unrelated query
+        self._closed = False  # Whether the turn that started the search has ended
+        self._lock = threading.Lock()
+
+
+    ##############################################
+    # Define the matches method
+    # ============================================
+    def matches(self, query):
+        """
+        Check whether a query asks for the same information as the speculative search.
+
+        Args:
+            query (str): The query the model asked for.
+
+        Returns:
+            bool: True if enough of the query's words appear in the speculative query.
+        """
+        requested = _words(query)
+        if not requested:
+            return False
+        return len(requested & _words(self.query)) / len(requested) >= min_overlap
+
+
+    ##############################################
+    # Define the claim method
+    # ============================================
+    def claim(self, query):
+        """
+        Take over the speculative search for a google_search call, at most once and only during its turn.
+
+        Args:
+            query (str): The query the model asked for.
+
+        Returns:
+            bool: True if the caller now owns the search and must resolve() it.
+        """
+        with self._lock:
+            if self.claimed or self._closed:
+                return False
+            if not self.matches(query):
+                self._requested = True
+                return False
+            self.claimed = True
+            return True
+
+
+    ##############################################
+    # Define the resolve method
+    # ============================================
+    def resolve(self, used):
+        """
+        Record the outcome of a claimed search once its owner knows whether the result was returned.
+
+        Args:
+            used (bool): True if the prefetched result was returned to the google_search call.
+        """
+        self._record("hits" if used else "misses")
+
+
+    ##############################################
+    # Define the close method
+    # ============================================
+    def close(self):
+        """
+        End the turn of the search, dropping it unless a google_search call has claimed it.
+        """
+        with self._lock:
+            self._closed = True
+            claimed = self.claimed
+        if not claimed:
+            self.future.cancel()  # Skip the search if it has not started yet
+            self._record("misses" if self._requested else "dropped")
+
+
+    def _record(self, outcome):
+        """
+        Record an outcome unless one was already recorded.
+
+        Args:
+            outcome (str): One of "hits", "misses" or "dropped".
+        """
+        with self._lock:
+            if self.outcome is not None:
+                return
+            self.outcome = outcome
+        _metrics.record(outcome)
+
+
+# Process-wide metrics, the search currently active in this context and the shared executor
+_metrics = PrefetchMetrics()
+_active_search = contextvars.ContextVar("active_speculative_search", default=None)
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _words(text):
+    """
+    Split text into a set of lowercase words.
+
+    Args:
+        text (str): The text to split.
+
+    Returns:
+        set: The words of the text.
+    """
+    return set(re.findall(r"\w+", text.lower()))
+
+
+def _get_executor():
+    """
+    Return the shared speculative search executor, creating it on first use.
+
+    Returns:
+        ThreadPoolExecutor: The shared executor.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=prefetch_workers, thread_name_prefix="search-prefetch")
+            atexit.register(_executor.shutdown, wait=False)
+        return _executor
+
+
+##############################################
+# Define the should_prefetch function
+# ============================================
+def should_prefetch(text):
+    """
+    Check whether the text contains a phrase for which the prompt requires a Google search.
+
+    Args:
+        text (str): The user's input.
+
+    Returns:
+        bool: True if a speculative search is worth starting.
+    """
+    return bool(_trigger_pattern.search(text))
+
+
+##############################################
+# Define the speculative_search function
+# ============================================
+@contextmanager
+def speculative_search(query):
+    """
+    Run a speculative search in the background for the duration of the block.
+
+    Within the block, claim_prefetched() hands the running search to a matching google_search call.
+    On exit, a search that nothing claimed is cancelled if it has not started yet, counted as a miss
+    if google_search asked for something else and as dropped otherwise; it can no longer be claimed.
+
+    Args:
+        query (str): The query to search for.
+
+    Yields:
+        SpeculativeSearch: The running speculative search.
+    """
+    search = SpeculativeSearch(query, _get_executor().submit(lambda: get_search_client().run(query)))
+    _metrics.record("started")
+    token = _active_search.set(search)
+    try:
+        yield search
+    finally:
+        _active_search.reset(token)
+        search.close()
+
+
+##############################################
+# Define the claim_prefetched function
+# ============================================
+def claim_prefetched(query):
+    """
+    Hand the active speculative search to a google_search call if it matches the query.
+
+    Each speculative search can be claimed once, and only during its turn; other calls search live.
+    The caller must resolve() the returned search once it knows whether its result was used.
+
+    Args:
+        query (str): The query the model asked for.
+
+    Returns:
+        SpeculativeSearch: The claimed speculative search, or None if the search must run live.
+    """
+    search = _active_search.get()
+    if search is None or not search.claim(query):
+        return None
+    return search
+
+
+##############################################
+# Define the get_prefetch_metrics function
+# ============================================
+def get_prefetch_metrics():
+    """
+    Return a snapshot of the speculative search metrics.
+
+    Returns:
+        dict: The started, hits, misses and dropped counters and the hit_rate.
+    """
+    return _metrics.snapshot()
@@ -0,0 +1,228 @@
+import socket
+import time
+import threading
+from concurrent.futures import Future
+import httpx
+import pytest
+from langchain.agents import AgentExecutor
+from langchain.tools import BaseTool
+from langchain_core.agents import AgentAction, AgentFinish
+from langchain_core.runnables import RunnableLambda
+from src.controllers.interaction_handler import InteractionHandler
+from src.utils import agent_setup_openai
+from src.utils.deadline import (
+    Deadline,
+    DeadlineExceeded,
+    call_with_deadline,
+    deadline_scope,
+    report_step_timeout,
+    run_until_deadline,
+    step_timeout,
+    wait_with_deadline,
+)
+
+
+def test_deadline_splits_usable_time_between_steps():
+    deadline = Deadline(10, reserve=0.2, step_share=0.5)
+
+    assert deadline.reserve == 2
+    assert 7.9 < deadline.usable() <= 8
+    assert 3.9 < deadline.step_timeout() <= 4
+    assert not deadline.expired()
+
+    deadline.cancel()
+    assert deadline.expired()
+    with pytest.raises(DeadlineExceeded):
+        deadline.step_timeout()
+
+
+def test_deadline_expires_at_its_reserve():
+    deadline = Deadline(0.05, reserve=0.5)
+    time.sleep(0.03)
+
+    # Past the usable time, but the reserve is still left for a best-effort answer
+    assert deadline.expired()
+    assert deadline.remaining() > 0
+    assert deadline.usable() == 0
+
+
+def test_step_timeout_is_unbounded_without_deadline():
+    assert step_timeout() is None
+    assert call_with_deadline(lambda value: value * 2, 21) == 42
+
+
+def test_run_until_deadline_times_out_and_cancels():
+    deadline = Deadline(0.1, reserve=0)
+    release = threading.Event()
+
+    with pytest.raises(DeadlineExceeded):
+        run_until_deadline(lambda: release.wait(5), deadline)
+
+    assert deadline.cancelled
+    release.set()
+
+
+def test_run_until_deadline_returns_result_with_deadline_active():
+    deadline = Deadline(5)
+
+    assert run_until_deadline(lambda: step_timeout() is not None, deadline)
+    assert not deadline.cancelled
+
+
+def test_run_until_deadline_passes_own_timeouts_through():
+    deadline = Deadline(5)
+
+    def read():
+        raise socket.timeout("read timed out")
+
+    # A socket timeout inside the turn is not the turn's deadline
+    with pytest.raises(socket.timeout) as raised:
+        run_until_deadline(read, deadline)
+    assert not isinstance(raised.value, DeadlineExceeded)
+    assert not deadline.cancelled
+
+
+def test_wait_with_deadline_passes_own_timeouts_through():
+    future = Future()
+    future.set_exception(TimeoutError("connect timed out"))
+
+    with deadline_scope(Deadline(5)):
+        with pytest.raises(TimeoutError) as raised:
+            wait_with_deadline(future)
+    assert not isinstance(raised.value, DeadlineExceeded)
+
+
+def test_call_with_deadline_stops_waiting_for_slow_calls():
+    release = threading.Event()
+
+    with deadline_scope(Deadline(0.2, reserve=0, step_share=0.5)):
+        with pytest.raises(DeadlineExceeded):
+            call_with_deadline(release.wait, 5)
+    release.set()
+
+
+class SlowTool:
+    name = "slow_tool"
+
+    @report_step_timeout
+    def _run(self):
+        raise DeadlineExceeded("Step did not finish within 1.0s")
+
+
+def test_report_step_timeout_returns_observation_while_turn_has_time():
+    deadline = Deadline(5)
+    with deadline_scope(deadline):
+        observation = SlowTool()._run()
+
+    assert observation.startswith("The slow_tool tool was cancelled because it took too long")
+    assert deadline.timed_out_steps == ["slow_tool"]
+
+
+def test_report_step_timeout_raises_once_turn_is_out_of_time():
+    deadline = Deadline(5)
+    deadline.cancel()
+
+    with deadline_scope(deadline), pytest.raises(DeadlineExceeded):
+        SlowTool()._run()
+    with pytest.raises(DeadlineExceeded):
+        SlowTool()._run()
+    # An out-of-time turn is reported as timed out, not as a timed-out step
+    assert deadline.timed_out_steps == []
+
+
+@pytest.fixture
+def handler(mocker):
+    # Skip the tool and model setup; each test stubs what it needs
+    handler = InteractionHandler.__new__(InteractionHandler)
+    handler.best_effort_chain = mocker.Mock()
+    handler.agent_executor = mocker.Mock()
+    return handler
+
+
+@pytest.fixture
+def inputs():
+    return {"input": "What's the latest on the launch?", "chat_history": []}
+
+
+def test_best_effort_result_uses_chain_answer(handler, inputs):
+    handler.best_effort_chain.invoke.return_value = "The launch was delayed."
+    observations = [(AgentAction("google_search", "launch", ""), "Launch delayed to Friday")]
+
+    result = handler.best_effort_result(inputs, observations, Deadline(5))
+
+    assert result == {**inputs, "output": "The launch was delayed.", "timed_out": True}
+    assert "Launch delayed to Friday" in handler.best_effort_chain.invoke.call_args.args[0]["observations"]
+
+
+def test_best_effort_result_falls_back_to_observations(handler, inputs):
+    handler.best_effort_chain.invoke.side_effect = RuntimeError("model unavailable")
+    observations = [(AgentAction("google_search", "launch", ""), "Launch delayed to Friday")]
+
+    result = handler.best_effort_result(inputs, observations, Deadline(5))
+
+    assert result["timed_out"]
+    assert "Launch delayed to Friday" in result["output"]
+
+
+class StubTool(BaseTool):
+    name: str = "slow_search"
+    description: str = "Searches, but always runs out of time."
+
+    @report_step_timeout
+    def _run(self, query: str) -> str:
+        raise DeadlineExceeded("Step did not finish within 1.0s")
+
+
+def stub_agent_executor(tool_calls):
+    # A real executor driven by a stub agent that calls the tool a number of times, then answers
+    def plan(inputs):
+        if len(inputs["intermediate_steps"]) < tool_calls:
+            return AgentAction("slow_search", "launch", "")
+        return AgentFinish({"output": "Done."}, "")
+    return AgentExecutor(agent=RunnableLambda(plan), tools=[StubTool()])
+
+
+def test_invoke_agent_returns_same_shape_on_every_path(handler, inputs):
+    handler.agent_executor = stub_agent_executor(tool_calls=0)
+    handler.best_effort_chain.invoke.return_value = "Done."
+
+    unbounded = handler.invoke_agent(inputs)
+    with deadline_scope(Deadline(5)):
+        bounded = handler.invoke_agent(inputs)
+    best_effort = handler.best_effort_result(inputs, [], Deadline(5))
+
+    assert unbounded == bounded == {**inputs, "output": "Done."}
+    assert best_effort == {**inputs, "output": "Done.", "timed_out": True}
+
+
+def test_handle_input_reports_timed_out_tool_steps(handler):
+    handler.agent_executor = stub_agent_executor(tool_calls=3)
+    handler.chat_history = []
+    handler.speculative_search = False
+
+    result = handler.handle_input("What's the latest on the launch?", deadline=5)
+
+    # The turn finished in time, but each tool call ran out of its share
+    assert result["output"] == "Done."
+    assert not result["timed_out"]
+    assert result["timed_out_steps"] == ["slow_search"] * 3
+
+
+def test_bounded_model_step_is_not_retried(mocker):
+    attempts = []
+
+    def stall(request):
+        attempts.append(request)
+        raise httpx.ReadTimeout("stalled", request=request)
+
+    client = httpx.Client(transport=httpx.MockTransport(stall))
+    mocker.patch.object(agent_setup_openai, "get_http_client", return_value=client)
+    llm = agent_setup_openai.with_step_timeout(agent_setup_openai.create_llm(), agent_setup_openai.create_llm(max_retries=0))
+    deadline = Deadline(5)
+
+    with deadline_scope(deadline), pytest.raises(DeadlineExceeded):
+        llm.invoke("What's the latest on the launch?")
+
+    # A retry would get the full step timeout again and overrun the step's share
+    assert len(attempts) == 1
+    assert deadline.timed_out_steps == ["model"]
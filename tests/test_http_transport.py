@@ -0,0 +1,82 @@
+import threading
+import pytest
+from src.utils import http_transport
+from src.utils.http_transport import ConnectionMetrics, get_search_client
+
+
+def test_connection_metrics_snapshot():
+    metrics = ConnectionMetrics()
+    metrics.record("api.openai.com", True)
+    metrics.record("api.openai.com", False)
+    metrics.record("api.openai.com", False)
+    metrics.record("www.googleapis.com", True)
+
+    snapshot = metrics.snapshot()
+
+    assert snapshot["api.openai.com"] == {
+        "requests": 3,
+        "connections_opened": 1,
+        "connections_reused": 2,
+        "reuse_ratio": 2 / 3,
+    }
+    assert snapshot["www.googleapis.com"]["connections_reused"] == 0
+    assert snapshot["www.googleapis.com"]["reuse_ratio"] == 0.0
+
+    # The snapshot is a copy, unaffected by later requests
+    metrics.record("www.googleapis.com", False)
+    assert snapshot["www.googleapis.com"]["requests"] == 1
+
+
+@pytest.fixture
+def search_mocks(mocker):
+    mocker.patch.object(http_transport, "_thread_local", threading.local())
+    wrapper = mocker.patch.object(http_transport, "GoogleSearchAPIWrapper", side_effect=lambda **kwargs: mocker.Mock())
+    build = mocker.patch.object(http_transport, "build", side_effect=lambda *args, **kwargs: mocker.Mock())
+    return wrapper, build
+
+
+def test_get_search_client_is_per_thread(search_mocks):
+    wrapper, build = search_mocks
+    clients = {}
+
+    def collect(name):
+        clients[name] = (get_search_client(), get_search_client())
+
+    threads = [threading.Thread(target=collect, args=(name,)) for name in ("first", "second")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Each thread reuses its own client, and no two threads share one
+    assert clients["first"][0] is clients["first"][1]
+    assert clients["second"][0] is clients["second"][1]
+    assert clients["first"][0] is not clients["second"][0]
+    assert wrapper.call_count == 2
+
+    # Each client's service runs on its own metered keep-alive connection
+    https = [call.kwargs["http"] for call in build.call_args_list]
+    assert len(https) == 2 and https[0] is not https[1]
+    assert all(isinstance(http, http_transport.MeteredHttp) for http in https)
+
+
+def test_metered_http_set_timeout_reaches_open_connections(mocker):
+    http = http_transport.MeteredHttp()
+    open_conn, closed_conn = mocker.Mock(), mocker.Mock(sock=None)
+    http.connections = {"https:open": open_conn, "https:closed": closed_conn}
+
+    http.set_timeout(2.5)
+
+    # New connections pick up the timeout, and in-flight sockets stop waiting at it
+    assert http.timeout == 2.5
+    assert open_conn.timeout == closed_conn.timeout == 2.5
+    open_conn.sock.settimeout.assert_called_once_with(2.5)
+
+
+def test_get_search_client_applies_step_timeout(search_mocks):
+    get_search_client(1.5)
+    assert http_transport._thread_local.http.timeout == 1.5
+
+    # Without a step timeout the client falls back to the configured read timeout
+    get_search_client()
+    assert http_transport._thread_local.http.timeout == http_transport.get_http_timeout().read
@@ -0,0 +1,69 @@
+import os
+import base64
+import io
+import time
+import pytest
+from PIL import Image
+from src.utils.image_worker import ImageWorkerPool
+
+
+def shared_memory_blocks():
+    return set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+
+def wait_for_shared_memory_blocks(expected, timeout=2.0):
+    # Blocks are released by a done-callback that may run just after the result is returned
+    deadline = time.monotonic() + timeout
+    while shared_memory_blocks() != expected and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return shared_memory_blocks()
+
+
+@pytest.fixture(scope="module")
+def pools():
+    inline, pooled = ImageWorkerPool(0), ImageWorkerPool(2)
+    yield inline, pooled
+    pooled.shutdown()
+
+
+def test_submit_data_url_matches_inline(pools, tmp_path):
+    file_path = str(tmp_path / "image.png")
+    Image.new("RGB", (50, 40), (10, 20, 30)).save(file_path)
+    blocks_before = shared_memory_blocks()
+
+    inline_url, pooled_url = (pool.submit_data_url(file_path).result() for pool in pools)
+
+    assert pooled_url == inline_url
+    assert pooled_url.startswith("data:image/png;base64,")
+    with Image.open(io.BytesIO(base64.b64decode(pooled_url.split(",", 1)[1]))) as img:
+        assert img.getpixel((0, 0)) == (10, 20, 30)
+    assert wait_for_shared_memory_blocks(blocks_before) == blocks_before
+
+
+def test_submit_save_raw_as_png_converts_bgrx(pools, tmp_path):
+    raw = bytearray([30, 20, 10, 255]) * (50 * 40)  # BGRX pixels as grabbed by mss
+    blocks_before = shared_memory_blocks()
+
+    for name, pool in zip(("inline", "pooled"), pools):
+        file_path = pool.submit_save_raw_as_png(raw, (50, 40), str(tmp_path / f"{name}.png"), "BGRX").result()
+        with Image.open(file_path) as img:
+            assert img.format == "PNG"
+            assert img.size == (50, 40)
+            assert img.getpixel((49, 39)) == (10, 20, 30)
+
+    assert wait_for_shared_memory_blocks(blocks_before) == blocks_before
+
+
+def test_submit_save_raw_as_png_releases_cancelled_jobs(pools, tmp_path):
+    _, pooled = pools
+    blocks_before = shared_memory_blocks()
+    raw = bytearray(4 * 64 * 64)
+
+    futures = [pooled.submit_save_raw_as_png(raw, (64, 64), str(tmp_path / f"{index}.png"), "BGRX") for index in range(8)]
+    for future in futures:
+        future.cancel()
+    for future in futures:
+        if not future.cancelled():
+            future.result()
+
+    assert wait_for_shared_memory_blocks(blocks_before) == blocks_before
@@ -0,0 +1,102 @@
+import threading
+import pytest
+from src.utils import search_prefetch
+from src.utils.search_prefetch import (
+    PrefetchMetrics,
+    SpeculativeSearch,
+    claim_prefetched,
+    should_prefetch,
+    speculative_search,
+)
+
+
+@pytest.fixture
+def metrics(mocker):
+    metrics = PrefetchMetrics()
+    mocker.patch.object(search_prefetch, "_metrics", metrics)
+    return metrics
+
+
+@pytest.fixture
+def search_client(mocker):
+    client = mocker.Mock()
+    client.run.side_effect = lambda query: f"results for {query}"
+    mocker.patch.object(search_prefetch, "get_search_client", return_value=client)
+    return client
+
+
+@pytest.mark.parametrize("text", [
+    "What's the latest on the Mars mission?",
+    "Any breaking news about the election",
+    "What is the weather TODAY",
+    "Show me recent updates",
+])
+def test_should_prefetch_matches_trigger_phrases(text):
+    assert should_prefetch(text)
+
+
+@pytest.mark.parametrize("text", [
+    "Write a poem about the sea",
+    "Subscribe me to the newsletter",
+    "I updated my profile",
+    "todays plan",
+])
+def test_should_prefetch_ignores_partial_words(text):
+    assert not should_prefetch(text)
+
+
+def test_speculative_search_matches_overlapping_queries():
+    search = SpeculativeSearch("what's the latest on the SpaceX launch?", future=None)
+
+    assert search.matches("SpaceX launch latest")
+    assert not search.matches("weather in Paris")
+    assert not search.matches("")
+
+
+def test_claimed_search_is_a_hit_once(metrics, search_client):
+    with speculative_search("latest SpaceX launch news"):
+        prefetched = claim_prefetched("SpaceX launch news")
+        assert prefetched.future.result() == "results for latest SpaceX launch news"
+        prefetched.resolve(used=True)
+        # A second call in the same turn searches live
+        assert claim_prefetched("SpaceX launch news") is None
+
+    assert search_client.run.call_count == 1
+    assert metrics.snapshot() == {"started": 1, "hits": 1, "misses": 0, "dropped": 0, "hit_rate": 1.0}
+
+
+def test_unrelated_search_is_one_miss(metrics, search_client):
+    with speculative_search("latest SpaceX launch news"):
+        assert claim_prefetched("weather in Paris") is None
+        assert claim_prefetched("stock prices") is None
+
+    assert metrics.snapshot() == {"started": 1, "hits": 0, "misses": 1, "dropped": 0, "hit_rate": 0.0}
+
+
+def test_failed_claimed_search_is_a_miss(metrics, search_client):
+    with speculative_search("latest SpaceX launch news"):
+        prefetched = claim_prefetched("SpaceX launch news")
+        prefetched.resolve(used=False)
+
+    assert metrics.snapshot()["misses"] == 1
+    assert metrics.snapshot()["hits"] == 0
+
+
+def test_unclaimed_search_is_dropped_and_cannot_be_claimed_later(metrics, search_client):
+    with speculative_search("latest SpaceX launch news") as search:
+        pass
+
+    # A turn abandoned by its deadline may still ask after the turn ended
+    assert not search.claim("SpaceX launch news")
+    assert claim_prefetched("SpaceX launch news") is None
+    assert metrics.snapshot() == {"started": 1, "hits": 0, "misses": 0, "dropped": 1, "hit_rate": 0.0}
+
+
+def test_speculative_search_is_only_visible_in_its_context(metrics, search_client):
+    claimed = []
+    with speculative_search("latest SpaceX launch news"):
+        thread = threading.Thread(target=lambda: claimed.append(claim_prefetched("SpaceX launch news")))
+        thread.start()
+        thread.join()
+
+    assert claimed == [None]